@@ -1,8 +1,16 @@
+import functools
+import hashlib
+import json
 import os
+import random
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import asyncio
+import atexit
 
 import pdfplumber
 from dotenv import load_dotenv
@@ -22,6 +30,15 @@ from pydrive2.drive import GoogleDrive
 # ===================== CONFIG ===================== #
 
 PDF_FOLDER = Path("pdfs")
+DRIVE_MANIFEST = PDF_FOLDER / ".manifest.json"
+SYNC_STAMP = PDF_FOLDER / ".sync_stamp"
+
+# How long a finished sync stays "fresh" (seconds). While fresh, new queries
+# reuse the local pdfs folder instead of hitting Drive again.
+SYNC_TTL = int(os.getenv("SYNC_TTL", "300"))
+
+# How many Drive downloads run in parallel during a sync
+DRIVE_CONCURRENCY = int(os.getenv("DRIVE_CONCURRENCY", "8"))
 
 LOG_FOLDER = Path("logs")
 RATING_LOG = LOG_FOLDER / "ratings.txt"
@@ -29,6 +46,38 @@ FEEDBACK_LOG = LOG_FOLDER / "feedback.txt"
 
 FEEDBACK_PREFIX = "FB:"
 
+# ===================== COMPILED REGEXES ===================== #
+# These run per line per page on the PDF-parsing hot path, so compile
+# them once at import instead of going through re's per-call cache.
+
+_RE_SLOT_PAREN = re.compile(r"Slot\s*:?\.?\s*([A-Z])\s*\(([^)]+)\)", re.IGNORECASE)
+_RE_SLOT_RANGE = re.compile(
+    r"Slot\s*:?\.?\s*([A-Z])\s+([0-9]{1,2}:[0-9]{2}\s*[AP]M\s*[-–]\s*[0-9]{1,2}:[0-9]{2}\s*[AP]M)",
+    re.IGNORECASE,
+)
+_RE_DATE = re.compile(r"Date\s*:\s*([0-9]{2}[-/][0-9]{2}[-/][0-9]{4})", re.IGNORECASE)
+_RE_ANY_SECTION = re.compile(r"\b\d{2}_[A-Z]\b")
+_RE_ROOM_LINE = re.compile(r"^\s*([\w-]+)\s+(\d+)\s*$")
+_RE_TRAILING_INITIALS = re.compile(r"[A-Za-z]{2,4}")
+# One fullmatch classifies every incoming message for handle_section
+# instead of trying each kind in turn.
+_RE_DISPATCH = re.compile(
+    r"(?P<menu>📋 MENU)"
+    r"|(?P<info>ℹ️ INFO)"
+    r"|(?P<rating>[1-5]\*)"
+    rf"|{FEEDBACK_PREFIX}(?P<feedback>(?s:.*))"
+    r"|(?P<section>\d{2}_[A-Z])"
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _course_line_re(prefix: str) -> re.Pattern:
+    """
+    One pattern matching a whole course row: course id, title, section
+    token of the given batch. [ \\t] keeps the match on a single line.
+    """
+    return re.compile(rf"([A-Z]{{3}}\d{{3,4}})[ \t]+(.+?)[ \t]+{prefix}_[A-Z]\b")
+
 
 def get_drive_folder_id() -> str:
     folder_id = os.getenv("DRIVE_FOLDER_ID")
@@ -42,59 +91,196 @@ def get_drive_folder_id() -> str:
 
 # ===================== LOGGING HELPERS ===================== #
 
+_rating_fh = None
+_feedback_fh = None
+
+# Queue + background writer so handlers never block on disk I/O.
+# Created in main() once the event loop exists.
+_log_queue = None
+
+_LOG_BATCH_MAX = 64
+_LOG_FLUSH_INTERVAL = 0.5
+
+
+def _write_log_lines(items):
+    for fh, line in items:
+        fh.write(line)
+
+
+async def _log_writer():
+    """Drain queued log lines in batches so bursts cost one write each."""
+    while True:
+        items = [await _log_queue.get()]
+        deadline = time.monotonic() + _LOG_FLUSH_INTERVAL
+        while len(items) < _LOG_BATCH_MAX:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(_log_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await asyncio.to_thread(_write_log_lines, items)
+
+
 def ensure_log_folder():
+    """Create the log folder and open both log files once per process."""
+    global _rating_fh, _feedback_fh
+
     LOG_FOLDER.mkdir(exist_ok=True)
 
+    # Line-buffered append handles kept open for the process lifetime,
+    # instead of an open/close syscall pair per logged line.
+    if _rating_fh is None:
+        _rating_fh = open(RATING_LOG, "a", buffering=1, encoding="utf-8")
+        atexit.register(_rating_fh.close)
+    if _feedback_fh is None:
+        _feedback_fh = open(FEEDBACK_LOG, "a", buffering=1, encoding="utf-8")
+        atexit.register(_feedback_fh.close)
+
 
 def log_rating(user, rating: str):
-    ensure_log_folder()
+    if _rating_fh is None:  # normally opened once via post_init
+        ensure_log_folder()
     full_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or "Unknown"
-    line = f"{datetime.now().isoformat()} | name={full_name} | rating={rating}\n"
-    with open(RATING_LOG, "a", encoding="utf-8") as f:
-        f.write(line)
+    # strftime with an explicit format is cheaper than isoformat and
+    # produces the same timestamp layout as the existing log lines
+    line = f"{datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%f')} | name={full_name} | rating={rating}\n"
+    if _log_queue is not None:
+        _log_queue.put_nowait((_rating_fh, line))
+    else:
+        _rating_fh.write(line)
 
 
 def log_feedback(user, feedback: str):
-    ensure_log_folder()
+    if _feedback_fh is None:  # normally opened once via post_init
+        ensure_log_folder()
     full_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or "Unknown"
-    line = f"{datetime.now().isoformat()} | name={full_name} | feedback={feedback}\n"
-    with open(FEEDBACK_LOG, "a", encoding="utf-8") as f:
-        f.write(line)
+    line = f"{datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%f')} | name={full_name} | feedback={feedback}\n"
+    if _log_queue is not None:
+        _log_queue.put_nowait((_feedback_fh, line))
+    else:
+        _feedback_fh.write(line)
 
 
 # ===================== TELEGRAM KEYBOARDS ===================== #
+# The keyboards never change, so build them once at import instead of
+# allocating new button/markup objects for every reply.
+
+_MAIN_MENU_KB = ReplyKeyboardMarkup(
+    [[KeyboardButton("📋 MENU"), KeyboardButton("ℹ️ INFO")]],
+    resize_keyboard=True,
+    one_time_keyboard=False,
+)
+
+_RATING_KB = ReplyKeyboardMarkup(
+    [[KeyboardButton(f"{i}*") for i in range(1, 6)]],
+    resize_keyboard=True,
+    one_time_keyboard=True,
+)
+
 
 def main_menu_keyboard() -> ReplyKeyboardMarkup:
-    keyboard = [
-        [KeyboardButton("📋 MENU"), KeyboardButton("ℹ️ INFO")],
-    ]
-    return ReplyKeyboardMarkup(
-        keyboard,
-        resize_keyboard=True,
-        one_time_keyboard=False,
-    )
+    return _MAIN_MENU_KB
 
 
 def rating_keyboard() -> ReplyKeyboardMarkup:
-    keyboard = [[KeyboardButton(f"{i}*") for i in range(1, 6)]]
-    return ReplyKeyboardMarkup(
-        keyboard,
-        resize_keyboard=True,
-        one_time_keyboard=True,
-    )
+    return _RATING_KB
 
 
 # ===================== GOOGLE DRIVE SYNC ===================== #
 
-def sync_pdfs_from_drive() -> bool:
+_last_sync_ts = 0.0
+_last_sync_had_files = False
+_sync_lock = asyncio.Lock()
+
+
+def _corpus_fingerprint() -> str:
     """
-    Sync all PDFs from a specific Google Drive folder into the local `pdfs` folder.
-    Returns:
-        True  -> at least one PDF found & synced
-        False -> no PDFs in Drive folder
+    Cheap fingerprint of the local pdfs folder built from file names and
+    mtimes only (a handful of stat calls, no reads). Used as the cache
+    key for parsed/formatted results, so any sync that changes a file
+    retires stale entries automatically - across restarts too.
     """
-    print("🔁 Syncing PDFs from Google Drive...")
-    PDF_FOLDER.mkdir(exist_ok=True)
+    parts = sorted(
+        f"{p.name}:{p.stat().st_mtime_ns}" for p in PDF_FOLDER.glob("*.pdf")
+    )
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _load_manifest() -> dict:
+    try:
+        return json.loads(DRIVE_MANIFEST.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    tmp = DRIVE_MANIFEST.with_suffix(".json.tmp")
+    try:
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, DRIVE_MANIFEST)
+    except Exception as e:
+        print(f"⚠️ Could not write {DRIVE_MANIFEST}: {e}")
+
+
+def _write_sync_stamp() -> None:
+    try:
+        SYNC_STAMP.write_text(str(time.time()), encoding="utf-8")
+    except Exception as e:
+        print(f"⚠️ Could not write {SYNC_STAMP}: {e}")
+
+
+def _restore_sync_stamp() -> None:
+    """Carry sync freshness across restarts so boot does not force a resync."""
+    global _last_sync_ts, _last_sync_had_files
+
+    try:
+        elapsed = time.time() - float(SYNC_STAMP.read_text(encoding="utf-8"))
+    except Exception:
+        return
+
+    if 0 <= elapsed < SYNC_TTL:
+        _last_sync_ts = time.monotonic() - elapsed
+        _last_sync_had_files = any(PDF_FOLDER.glob("*.pdf"))
+
+
+async def maybe_sync() -> bool:
+    """
+    Run sync_pdfs_from_drive at most once per SYNC_TTL seconds.
+
+    Concurrent callers share one sync: the first one does the work while
+    the rest wait on the lock and reuse the fresh result. Returns the
+    same True/False as sync_pdfs_from_drive.
+    """
+    global _last_sync_ts, _last_sync_had_files
+
+    if time.monotonic() - _last_sync_ts < SYNC_TTL:
+        return _last_sync_had_files
+
+    async with _sync_lock:
+        # Another request may have finished the sync while we waited.
+        if time.monotonic() - _last_sync_ts < SYNC_TTL:
+            return _last_sync_had_files
+
+        has_files = await asyncio.to_thread(sync_pdfs_from_drive)
+        _last_sync_ts = time.monotonic()
+        _last_sync_had_files = has_files
+        return has_files
+
+
+_drive_client = None
+
+
+def _get_drive() -> GoogleDrive:
+    """
+    Return a shared GoogleDrive client, running the auth flow only once.
+
+    Later calls reuse the cached client (and its keep-alive HTTP
+    connection); an expired access token only triggers a short Refresh
+    instead of a full credentials reload + Authorize round-trip.
+    """
+    global _drive_client
 
     running_in_cloud = bool(os.getenv("WEBHOOK_URL"))
 
@@ -106,6 +292,19 @@ def sync_pdfs_from_drive() -> bool:
         client_secrets_path = "client_secrets.json"
         credentials_path = "credentials.json"
 
+    if _drive_client is not None:
+        gauth = _drive_client.auth
+        if gauth.access_token_expired:
+            print("🔄 Access token expired, refreshing...")
+            gauth.Refresh()
+            if not running_in_cloud:
+                try:
+                    gauth.SaveCredentialsFile(credentials_path)
+                    print(f"Refreshed credentials saved to {credentials_path}")
+                except Exception as e:
+                    print(f"⚠️ Could not save refreshed credentials locally: {e}")
+        return _drive_client
+
     # Ignore settings.yaml – configure PyDrive2 fully in code
     settings = {
         "client_config_backend": "file",
@@ -165,45 +364,201 @@ def sync_pdfs_from_drive() -> bool:
         print("✅ Credentials loaded, authorizing...")
         gauth.Authorize()
 
-    drive = GoogleDrive(gauth)
+    _drive_client = GoogleDrive(gauth)
+    return _drive_client
+
+
+def sync_pdfs_from_drive() -> bool:
+    """
+    Sync all PDFs from a specific Google Drive folder into the local `pdfs` folder.
+    Returns:
+        True  -> at least one PDF found & synced
+        False -> no PDFs in Drive folder
+    """
+    print("🔁 Syncing PDFs from Google Drive...")
+    PDF_FOLDER.mkdir(exist_ok=True)
+
+    drive = _get_drive()
     folder_id = get_drive_folder_id()
 
     query = f"'{folder_id}' in parents and mimeType='application/pdf' and trashed=false"
-    file_list = drive.ListFile({"q": query}).GetList()
+    file_list = drive.ListFile({
+        "q": query,
+        # nextPageToken must survive the field mask or GetList stops
+        # paginating after the first 1000 files.
+        "fields": "items(id,title,modifiedDate,md5Checksum),nextPageToken",
+    }).GetList()
 
-    # Clear existing local PDFs
-    for local_pdf in PDF_FOLDER.glob("*.pdf"):
-        try:
-            local_pdf.unlink()
-        except Exception as e:
-            print(f"⚠️ Could not delete {local_pdf}: {e}")
+    old_manifest = _load_manifest()
+    manifest = {}
 
     if not file_list:
+        # Drive folder is empty -> mirror that locally
+        for local_pdf in PDF_FOLDER.glob("*.pdf"):
+            try:
+                local_pdf.unlink()
+            except Exception as e:
+                print(f"⚠️ Could not delete {local_pdf}: {e}")
+        _save_manifest(manifest)
+        _prune_text_cache()
+        _write_sync_stamp()
         print("⚠️ No PDFs found in the Drive folder.")
         return False
 
+    to_download = []
     for gfile in file_list:
-        file_name = gfile.get("title") or gfile.get("name") or f"{gfile['id']}.pdf"
+        file_id = gfile["id"]
+        file_name = gfile.get("title") or gfile.get("name") or f"{file_id}.pdf"
         local_path = PDF_FOLDER / file_name
-        print(f"⬇️ Downloading: {file_name} -> {local_path}")
-        gfile.GetContentFile(str(local_path))
+        md5 = gfile.get("md5Checksum", "")
+        mtime = gfile.get("modifiedDate", "")
+        manifest[file_id] = {"md5": md5, "mtime": mtime, "name": file_name}
+
+        old = old_manifest.get(file_id) if isinstance(old_manifest, dict) else None
+        old_md5 = old.get("md5", "") if isinstance(old, dict) else ""
+        old_mtime = old.get("mtime", "") if isinstance(old, dict) else ""
+
+        # Checksum is authoritative; modifiedDate covers files where
+        # Drive reports no md5.
+        unchanged = (md5 and md5 == old_md5) or (not md5 and mtime and mtime == old_mtime)
+        if unchanged and local_path.exists():
+            continue  # unchanged since last sync
+
+        to_download.append((gfile, local_path))
+
+    def _download_one(item):
+        gfile, local_path = item
+        # Write to a per-thread temp file and os.replace it into place, so
+        # a crashed or half-finished download never shadows a good PDF.
+        tmp_path = local_path.with_suffix(f".{threading.get_ident()}.part")
+        print(f"⬇️ Downloading: {local_path.name} -> {local_path}")
+        for attempt in range(4):
+            try:
+                gfile.GetContentFile(str(tmp_path))
+                os.replace(tmp_path, local_path)
+                return
+            except Exception as e:
+                if attempt == 3:
+                    raise
+                # Jittered exponential backoff, mainly for Drive 429/5xx
+                delay = (2 ** attempt) + random.uniform(0, 0.5)
+                print(f"⚠️ Download of {local_path.name} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    if to_download:
+        # Each GetContentFile is an independent HTTPS GET, so overlap them.
+        workers = min(DRIVE_CONCURRENCY, len(to_download))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_download_one, to_download))
+
+    # Drop local files that no longer exist on Drive
+    current_names = {entry["name"] for entry in manifest.values()}
+    for local_pdf in PDF_FOLDER.glob("*.pdf"):
+        if local_pdf.name not in current_names:
+            try:
+                local_pdf.unlink()
+            except Exception as e:
+                print(f"⚠️ Could not delete {local_pdf}: {e}")
 
+    _save_manifest(manifest)
+    _prune_text_cache()
+    _write_sync_stamp()
     print("✅ PDF sync finished.")
     return True
 
 
 # ===================== PDF PARSING HELPERS ===================== #
 
+# Extracted page text cached on disk per content hash, so unchanged PDFs
+# are parsed once ever, not once per query or process.
+TEXT_CACHE_DIR = PDF_FOLDER / ".cache"
+
+# Folded into every fingerprint so entries extracted by a different
+# backend (or a future incompatible one) can never be served as current.
+_TEXT_BACKEND = "pdfplumber-1"
+
+
+def _pdf_fingerprint(pdf_path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_TEXT_BACKEND.encode())
+    h.update(pdf_path.read_bytes())
+    return h.hexdigest()
+
+
+def _prune_text_cache() -> None:
+    """Drop .cache entries whose source PDF is gone, changed, or was
+    extracted by a different backend, plus any orphaned temp files."""
+    if not TEXT_CACHE_DIR.is_dir():
+        return
+
+    live = set()
+    for pdf_path in PDF_FOLDER.glob("*.pdf"):
+        try:
+            live.add(_pdf_fingerprint(pdf_path))
+        except Exception:
+            pass  # unreadable file -> just keep nothing for it
+
+    for entry in TEXT_CACHE_DIR.iterdir():
+        if entry.name.split(".", 1)[0] in live:
+            continue
+        try:
+            entry.unlink()
+        except Exception as e:
+            print(f"⚠️ Could not prune cache entry {entry.name}: {e}")
+
+
+def _extract_pages_text(pdf_path: Path) -> list:
+    """Return the plain text of every page, via the content-hash cache."""
+    try:
+        cache_path = TEXT_CACHE_DIR / f"{_pdf_fingerprint(pdf_path)}.json"
+    except Exception:
+        cache_path = None
+
+    if cache_path is not None and cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text(encoding="utf-8"))["pages"]
+        except Exception:
+            pass  # corrupt cache entry -> re-extract below
+
+    pages_text = _extract_pages_text_uncached(pdf_path)
+
+    if cache_path is not None:
+        try:
+            TEXT_CACHE_DIR.mkdir(exist_ok=True)
+            tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"pages": pages_text}), encoding="utf-8")
+            os.replace(tmp, cache_path)
+        except Exception as e:
+            print(f"⚠️ Could not write text cache for {pdf_path.name}: {e}")
+
+    return pages_text
+
+
+def _extract_pages_text_uncached(pdf_path: Path) -> list:
+    """
+    Return the plain text of every page of a PDF as a list of strings.
+
+    pdfplumber's layout analysis is what keeps each routine row on a
+    single line ("teacher section room seats total"), which the
+    line-based scans below depend on; faster raw-order extractors break
+    that invariant on these PDFs.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        pages_text = []
+        for page in pdf.pages:
+            pages_text.append(page.extract_text() or "")
+            # Drop pdfplumber's per-page layout cache as we go; otherwise
+            # every parsed page stays in memory until the document closes.
+            page.flush_cache()
+        return pages_text
+
+
 def parse_time(text: str) -> str:
-    m = re.search(r"Slot\s*:?\.?\s*([A-Z])\s*\(([^)]+)\)", text, re.IGNORECASE)
+    m = _RE_SLOT_PAREN.search(text)
     if m:
         return f"Slot {m.group(1).upper()} ({m.group(2).strip()})"
 
-    m = re.search(
-        r"Slot\s*:?\.?\s*([A-Z])\s+([0-9]{1,2}:[0-9]{2}\s*[AP]M\s*[-–]\s*[0-9]{1,2}:[0-9]{2}\s*[AP]M)",
-        text,
-        re.IGNORECASE,
-    )
+    m = _RE_SLOT_RANGE.search(text)
     if m:
         return f"Slot {m.group(1).upper()} ({m.group(2).strip()})"
 
@@ -211,7 +566,7 @@ def parse_time(text: str) -> str:
 
 
 def parse_date(text: str) -> str:
-    m = re.search(r"Date\s*:\s*([0-9]{2}[-/][0-9]{2}[-/][0-9]{4})", text, re.IGNORECASE)
+    m = _RE_DATE.search(text)
     if not m:
         return ""
 
@@ -224,8 +579,16 @@ def parse_date(text: str) -> str:
         return date_raw
 
 
-def parse_exam_type(text: str) -> str:
-    t = " ".join((text or "").lower().split())
+# The exam-type keywords live in the routine's header block, so only
+# this many characters of the first page need scanning/normalizing.
+_EXAM_TYPE_SCAN_CHARS = 600
+
+
+def parse_exam_type(text: str, pre_lowered: bool = False) -> str:
+    text = (text or "")[:_EXAM_TYPE_SCAN_CHARS]
+    if not pre_lowered:
+        text = text.lower()
+    t = " ".join(text.split())
     if not t:
         return ""
 
@@ -247,256 +610,429 @@ def parse_exam_type(text: str) -> str:
     return ""
 
 
+def _is_section_token(tok: str) -> bool:
+    """Fast path for the _RE_ANY_SECTION pattern on a single token."""
+    return (
+        len(tok) == 4
+        and tok[2] == "_"
+        and tok[0].isdigit()
+        and tok[1].isdigit()
+        and "A" <= tok[3] <= "Z"
+    )
+
+
 def parse_course_info(text: str, section_prefix: str):
-    for line in text.split("\n"):
-        if not re.search(rf"\b{section_prefix}_[A-Z]\b", line):
-            continue
+    # Cheap C-level substring reject before any regex
+    if section_prefix + "_" not in text:
+        return "", ""
 
-        m = re.search(r"\b([A-Z]{3}\d{3,4})\b", line)
-        if not m:
-            continue
+    # One DFA scan over the whole page replaces the per-line Python loop
+    m = _course_line_re(section_prefix).search(text)
+    if not m:
+        return "", ""
 
-        course_id = m.group(1)
-        parts = line.split()
-        idx = parts.index(course_id)
+    course_id = m.group(1)
+    raw_title = m.group(2).strip()
 
-        title_tokens = parts[idx + 1:]
+    tokens = raw_title.split()
+    while tokens and _RE_TRAILING_INITIALS.fullmatch(tokens[-1]) and any(
+        c.isupper() for c in tokens[-1]
+    ):
+        tokens.pop()
 
-        for i, tok in enumerate(title_tokens):
-            if re.fullmatch(rf"{section_prefix}_[A-Z]", tok):
-                title_tokens = title_tokens[:i]
-                break
+    course_name = " ".join(tokens)
+
+    if course_name.endswith("Desig"):
+        course_name = course_name + "n"
 
-        raw_title = " ".join(title_tokens).strip()
+    return course_name, course_id
 
-        tokens = raw_title.split()
-        while tokens and re.fullmatch(r"[A-Za-z]{2,4}", tokens[-1]) and any(
-            c.isupper() for c in tokens[-1]
-        ):
-            tokens.pop()
 
-        course_name = " ".join(tokens)
+def _scan_pages_for_section(pages_text: list, section_code: str, section_prefix: str) -> list:
+    """Scan already-extracted page texts for one section's exam info."""
+    results = []
 
-        if course_name.endswith("Desig"):
-            course_name = course_name + "n"
+    # No page mentions the section -> skip the per-page date/slot/course
+    # parsing outright; one substring scan per page is all we pay.
+    if not any(section_code in text for text in pages_text):
+        return results
 
-        return course_name, course_id
+    time_str = ""
+    date_str = ""
+    course_name = ""
+    course_id = ""
+    exam_type = ""
 
-    return "", ""
+    num_pages = len(pages_text)
 
+    for page_index in range(num_pages):
+        text = pages_text[page_index]
+        # Lowercase once per page; every substring gate below shares it.
+        lower_text = text.lower()
 
-def extract_all_section_infos(folder: Path, section_code: str):
-    results = []
-    section_prefix = section_code.split("_")[0]
-
-    for pdf_path in folder.glob("*.pdf"):
-        with pdfplumber.open(pdf_path) as pdf:
-            time_str = ""
-            date_str = ""
-            course_name = ""
-            course_id = ""
-            exam_type = ""
-
-            num_pages = len(pdf.pages)
-
-            if num_pages > 0:
-                first_text = pdf.pages[0].extract_text() or ""
-                exam_type = parse_exam_type(first_text)
-
-            for page_index in range(num_pages):
-                page = pdf.pages[page_index]
-                text = page.extract_text() or ""
-
-                if "date" in text.lower() and not date_str:
-                    maybe_date = parse_date(text)
-                    if maybe_date:
-                        date_str = maybe_date
-
-                if "slot" in text.lower():
-                    maybe_time = parse_time(text)
-                    if maybe_time:
-                        time_str = maybe_time
-                page_time_str = time_str
-
-                if not course_id:
-                    cn, cid = parse_course_info(text, section_prefix)
-                    if cid:
-                        course_name, course_id = cn, cid
-
-                if section_code not in text:
+        if page_index == 0:
+            exam_type = parse_exam_type(lower_text, pre_lowered=True)
+
+        if "date" in lower_text and not date_str:
+            maybe_date = parse_date(text)
+            if maybe_date:
+                date_str = maybe_date
+
+        if "slot" in lower_text:
+            maybe_time = parse_time(text)
+            if maybe_time:
+                time_str = maybe_time
+        page_time_str = time_str
+
+        if not course_id:
+            cn, cid = parse_course_info(text, section_prefix)
+            if cid:
+                course_name, course_id = cn, cid
+
+        if section_code not in text:
+            continue
+
+        combined_text = text
+        if page_index + 1 < num_pages:
+            combined_text = text + "\n" + pages_text[page_index + 1]
+
+        lines = combined_text.split("\n")
+        capturing = False
+        teacher = ""
+        total_seats = ""
+        rooms = []
+
+        for line in lines:
+            # Tokenize once and reuse; the exact-token test also protects
+            # parts.index below from substring-only matches.
+            parts = line.split()
+
+            if not capturing:
+                if section_code not in parts:
                     continue
+                capturing = True
+
+                idx = parts.index(section_code)
+                teacher = parts[idx - 1]
+                total_seats = parts[-1]
+
+                if idx + 3 < len(parts):
+                    room = parts[idx + 1]
+                    seats = parts[idx + 2]
+                    rooms.append((room, seats))
+                continue
+
+            # a different section's row ends our capture; plain string ops
+            # on the tokens beat running the regex NFA per line
+            if section_code not in parts and any(map(_is_section_token, parts)):
+                break
 
-                combined_text = text
-                if page_index + 1 < num_pages:
-                    next_text = pdf.pages[page_index + 1].extract_text() or ""
-                    combined_text = text + "\n" + next_text
-
-                lines = combined_text.split("\n")
-                capturing = False
-                teacher = ""
-                total_seats = ""
-                rooms = []
-
-                for line in lines:
-                    if section_code in line and not capturing:
-                        capturing = True
-                        parts = line.split()
-
-                        idx = parts.index(section_code)
-                        teacher = parts[idx - 1]
-                        total_seats = parts[-1]
-
-                        if idx + 3 < len(parts):
-                            room = parts[idx + 1]
-                            seats = parts[idx + 2]
-                            rooms.append((room, seats))
+            # room lines are exactly "<room> <seats>"
+            if len(parts) == 2:
+                m = _RE_ROOM_LINE.match(line)
+                if m:
+                    room, seats = m.groups()
+
+                    if room.lower() == "total":
                         continue
 
-                    if capturing:
-                        if re.search(r"\b\d{2}_[A-Z]\b", line) and section_code not in line:
-                            break
-
-                        m = re.match(r"^\s*([\w-]+)\s+(\d+)\s*$", line)
-                        if m:
-                            room, seats = m.groups()
-
-                            if room.lower() == "total":
-                                continue
-
-                            rooms.append((room, seats))
-
-                if rooms and teacher:
-                    results.append({
-                        "date": date_str,
-                        "time": page_time_str,
-                        "section": section_code,
-                        "teacher": teacher,
-                        "rooms": rooms,
-                        "total": total_seats,
-                        "course_name": course_name,
-                        "course_id": course_id,
-                        "exam_type": exam_type,
-                    })
-                    break
+                    rooms.append((room, seats))
+
+        if rooms and teacher:
+            results.append({
+                "date": date_str,
+                "time": page_time_str,
+                "section": section_code,
+                "teacher": teacher,
+                "rooms": rooms,
+                "total": total_seats,
+                "course_name": course_name,
+                "course_id": course_id,
+                "exam_type": exam_type,
+            })
+            break
 
     return results
 
 
-def format_section_infos(section_code: str) -> str:
+# ===================== SECTION INDEX ===================== #
+# Parsing a PDF yields data for every section at once, so build the full
+# {section_code: [info, ...]} map once per corpus state and answer
+# queries from it.
+
+_section_index = None
+_section_index_key = None
+_index_lock = threading.Lock()
+
+
+def _parse_all_sections_one_pdf(pdf_path: Path) -> dict:
+    """Parse one routine PDF into {section_code: [info, ...]} for every section."""
+    # The parsed result is a pure function of the file content, so keep
+    # it next to the page-text cache under the same content hash.
     try:
-        has_files = sync_pdfs_from_drive()
-    except Exception as e:
-        return (
-            "⚠️ Failed to sync PDFs from Google Drive.\n"
-            f"Error: `{e}`\n"
-            "Make sure Google Drive client secrets, credentials, "
-            "and DRIVE_FOLDER_ID are configured correctly."
-        )
+        cache_path = TEXT_CACHE_DIR / f"{_pdf_fingerprint(pdf_path)}.sections.json"
+    except Exception:
+        cache_path = None
 
-    if not has_files:
-        return (
-            "🛠️ Maintenance ongoing or routine coming soon.\n"
-            "Currently no routine PDF files are available in the system."
-        )
+    if cache_path is not None and cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text(encoding="utf-8"))
+        except Exception:
+            pass  # corrupt cache entry -> re-parse below
 
-    infos = extract_all_section_infos(PDF_FOLDER, section_code)
+    index = {}
+    pages_text = _extract_pages_text(pdf_path)
 
-    if not infos:
-        return f"❌ No occurrences of section `{section_code}` found."
+    codes = set()
+    for text in pages_text:
+        codes.update(m.group(0) for m in _RE_ANY_SECTION.finditer(text))
 
-    blocks = []
-    roman_map = {
-        1: "i", 2: "ii", 3: "iii", 4: "iv", 5: "v",
-        6: "vi", 7: "vii", 8: "viii", 9: "ix", 10: "x"
-    }
+    for code in codes:
+        infos = _scan_pages_for_section(pages_text, code, code.split("_")[0])
+        if infos:
+            index[code] = infos
 
-    for idx, info in enumerate(infos, start=1):
-        roman = roman_map.get(idx, str(idx))
-        block = []
-        block.append(f"({roman}) ==== 📚 SECTION `{info['section']}` ====")
+    if cache_path is not None:
+        try:
+            TEXT_CACHE_DIR.mkdir(exist_ok=True)
+            tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(index), encoding="utf-8")
+            os.replace(tmp, cache_path)
+        except Exception as e:
+            print(f"⚠️ Could not write section cache for {pdf_path.name}: {e}")
 
-        if info.get("exam_type"):
-            block.append(f"📝 Exam: {info['exam_type']}")
+    return index
 
-        if info["date"]:
-            block.append(f"📅 Date: {info['date']}")
-        else:
-            block.append("📅 Date: (not found)")
 
-        if info["time"]:
-            block.append(f"⏰ {info['time']}\n")
-        else:
-            block.append("⏰ Time / Slot: (not found)\n")
+def _build_section_index(folder: Path) -> dict:
+    index = {}
+
+    pdf_paths = list(folder.glob("*.pdf"))
+    if not pdf_paths:
+        return index
+
+    workers = min(os.cpu_count() or 1, len(pdf_paths))
+    if workers <= 1:
+        per_pdf = [_parse_all_sections_one_pdf(p) for p in pdf_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            per_pdf = list(executor.map(_parse_all_sections_one_pdf, pdf_paths))
+
+    for pdf_index in per_pdf:
+        for code, infos in pdf_index.items():
+            index.setdefault(code, []).extend(infos)
+
+    return index
+
+
+def _get_section_index(corpus_key: str) -> dict:
+    """Return the section index for one corpus state, building it once."""
+    global _section_index, _section_index_key
+
+    if _section_index is not None and _section_index_key == corpus_key:
+        return _section_index
 
-        block.append(f"📘 Course: {info['course_name']} ({info['course_id']})")
-        block.append(f"👨‍🏫 Teacher: {info['teacher']}\n")
+    with _index_lock:
+        if _section_index is None or _section_index_key != corpus_key:
+            _section_index = _build_section_index(PDF_FOLDER)
+            _section_index_key = corpus_key
+        return _section_index
 
-        block.append("🏫 Rooms & Seats:")
-        for room, seats in info["rooms"]:
-            block.append(f"- Room {room} — {seats}")
 
-        block.append(f"\n🧮 Total Seats: {info['total']}")
-        block.append("===============X==============")
+_ROMAN_MAP = {
+    1: "i", 2: "ii", 3: "iii", 4: "iv", 5: "v",
+    6: "vi", 7: "vii", 8: "viii", 9: "ix", 10: "x"
+}
 
-        blocks.append("\n".join(block))
 
-    return "\n\n".join(blocks)
+def _format_one_info(idx: int, info: dict) -> str:
+    roman = _ROMAN_MAP.get(idx, str(idx))
+
+    exam_line = f"📝 Exam: {info['exam_type']}\n" if info.get("exam_type") else ""
+    date_line = f"📅 Date: {info['date']}" if info["date"] else "📅 Date: (not found)"
+    time_line = f"⏰ {info['time']}" if info["time"] else "⏰ Time / Slot: (not found)"
+    rooms_lines = "\n".join(f"- Room {room} — {seats}" for room, seats in info["rooms"])
+
+    return (
+        f"({roman}) ==== 📚 SECTION `{info['section']}` ====\n"
+        f"{exam_line}"
+        f"{date_line}\n"
+        f"{time_line}\n\n"
+        f"📘 Course: {info['course_name']} ({info['course_id']})\n"
+        f"👨‍🏫 Teacher: {info['teacher']}\n\n"
+        "🏫 Rooms & Seats:\n"
+        f"{rooms_lines}\n\n"
+        f"🧮 Total Seats: {info['total']}\n"
+        "===============X=============="
+    )
+
+
+@functools.lru_cache(maxsize=2048)
+def _format_section_infos_cached(section_code: str, corpus_key: str) -> str:
+    infos = _get_section_index(corpus_key).get(section_code, [])
+
+    if not infos:
+        return f"❌ No occurrences of section `{section_code}` found."
+
+    return "\n\n".join(
+        _format_one_info(idx, info) for idx, info in enumerate(infos, start=1)
+    )
+
+
+def format_section_infos(section_code: str) -> str:
+    # Keyed by the corpus fingerprint, so any change to the pdfs folder
+    # invalidates cached replies without an explicit cache_clear.
+    return _format_section_infos_cached(section_code, _corpus_fingerprint())
 
 
 # ===================== TELEGRAM BOT PART ===================== #
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    text = (
-        "👋 Hi, I am *MR ROUTINE*.\n"
-        "Welcome! I can find your DIU exam routine by section.\n\n"
-        "👉 Just send me your *section code* in this format:\n"
-        "`66_A`, `69_K`, `64_B`, etc.\n\n"
-        "I'll sync the latest routine PDFs and show you the exam info.\n"
-        "Use /info to learn more about this bot."
+# Per-user reply cache: the same user hammering the same section within
+# the TTL gets the previous answer back without touching Drive or PDFs.
+_REPLY_CACHE_TTL = 60
+_REPLY_CACHE_MAX = 10_000
+_reply_cache = {}  # (user_id, section_code) -> (expires_at, text)
+
+
+def _cached_user_reply(user_id: int, section_code: str):
+    entry = _reply_cache.get((user_id, section_code))
+    if entry is None:
+        return None
+    expires_at, text = entry
+    if expires_at <= time.monotonic():
+        _reply_cache.pop((user_id, section_code), None)
+        return None
+    return text
+
+
+def _remember_user_reply(user_id: int, section_code: str, text: str) -> None:
+    if len(_reply_cache) >= _REPLY_CACHE_MAX:
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in _reply_cache.items() if exp <= now]:
+            _reply_cache.pop(key, None)
+        if len(_reply_cache) >= _REPLY_CACHE_MAX:
+            _reply_cache.clear()
+    _reply_cache[(user_id, section_code)] = (
+        time.monotonic() + _REPLY_CACHE_TTL,
+        text,
     )
+
+START_TEXT = (
+    "👋 Hi, I am *MR ROUTINE*.\n"
+    "Welcome! I can find your DIU exam routine by section.\n\n"
+    "👉 Just send me your *section code* in this format:\n"
+    "`66_A`, `69_K`, `64_B`, etc.\n\n"
+    "I'll sync the latest routine PDFs and show you the exam info.\n"
+    "Use /info to learn more about this bot."
+)
+
+INFO_TEXT = (
+    "ℹ️ *MR ROUTINE — Bot Info*\n\n"
+    "This bot was developed to quickly find DIU exam routines for specific sections by reading "
+    "official PDF routine files from Google Drive.\n\n"
+    "🔧 *How it works*\n"
+    "- Syncs the latest routine PDFs from a Drive folder\n"
+    "- Scans them for your section code (like `66_A`)\n"
+    "- Extracts exam type, date, time slot, course, teacher, rooms and total seats\n\n"
+    "⚠️ *Disclaimer*\n"
+    "- The bot may make mistakes while reading PDFs.\n"
+    "- Always double-check with the official routine from your department.\n\n"
+    "© MR ROUTINE\n"
+    "👨‍💻 Developer: Sifatur Rahman iMRAN.\n"
+    "This bot is made for educational and personal use to save time before exams."
+)
+
+WAIT_TEXT = (
+    "🔍 Syncing PDFs & searching, please wait...\n\n"
+    "⚠️ *Disclaimer:* This bot may make mistakes while reading PDFs. "
+    "Always double-check with the official routine."
+)
+
+THANK_TEXT = (
+    "🙏 *Thank you for using MR ROUTINE!* 🫶\n\n"
+    "⭐ *Rating:*\n"
+    "Tap a button or reply with `1*`, `2*`, `3*`, `4*` or `5*` to rate this bot.\n\n"
+    "💬 *Feedback:*\n"
+    "Send a message starting with `FB:` followed by your feedback.\n"
+    "Example:\n"
+    "`FB: Please also add day-wise filter or some problem found.`"
+)
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.message.reply_text(
-        text,
+        START_TEXT,
         parse_mode="Markdown",
         reply_markup=main_menu_keyboard(),
     )
 
 
 async def info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    text = (
-        "ℹ️ *MR ROUTINE — Bot Info*\n\n"
-        "This bot was developed to quickly find DIU exam routines for specific sections by reading "
-        "official PDF routine files from Google Drive.\n\n"
-        "🔧 *How it works*\n"
-        "- Syncs the latest routine PDFs from a Drive folder\n"
-        "- Scans them for your section code (like `66_A`)\n"
-        "- Extracts exam type, date, time slot, course, teacher, rooms and total seats\n\n"
-        "⚠️ *Disclaimer*\n"
-        "- The bot may make mistakes while reading PDFs.\n"
-        "- Always double-check with the official routine from your department.\n\n"
-        "© MR ROUTINE\n"
-        "👨‍💻 Developer: Sifatur Rahman iMRAN.\n"
-        "This bot is made for educational and personal use to save time before exams."
-    )
     await update.message.reply_text(
-        text,
+        INFO_TEXT,
         parse_mode="Markdown",
         reply_markup=main_menu_keyboard(),
     )
 
 
+async def sync_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Force a fresh Drive sync, bypassing the TTL. Admin-only if set."""
+    global _last_sync_ts
+
+    # With no admin configured, anyone could hammer Drive through the
+    # TTL bypass - so the command stays off until ADMIN_USER_ID is set.
+    admin_id = os.getenv("ADMIN_USER_ID")
+    if not admin_id:
+        await update.message.reply_text(
+            "⛔ /sync is disabled: no ADMIN_USER_ID is configured."
+        )
+        return
+    if str(update.effective_user.id) != admin_id:
+        await update.message.reply_text("⛔ This command is for the bot admin only.")
+        return
+
+    _last_sync_ts = 0.0
+    status_msg = await update.message.reply_text("🔁 Forcing a fresh PDF sync...")
+
+    try:
+        has_files = await maybe_sync()
+    except Exception as e:
+        await status_msg.edit_text(f"⚠️ Sync failed: `{e}`", parse_mode="Markdown")
+        return
+
+    if has_files:
+        await status_msg.edit_text("✅ Sync finished. Routine PDFs are up to date.")
+    else:
+        await status_msg.edit_text(
+            "⚠️ Sync finished, but no PDFs were found in the Drive folder."
+        )
+
+
 async def handle_section(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     section_input = (update.message.text or "").strip().upper()
 
-    if section_input == "📋 MENU":
+    m = _RE_DISPATCH.fullmatch(section_input)
+
+    if m is None:
+        await update.message.reply_text(
+            "⚠️ Please send a valid section code like `66_A` or `69_K`.\n\n"
+            "For feedback, start your message with `FB:`.\n"
+            "For rating, reply with `1*`, `2*`, `3*`, `4*` or `5*`.",
+            parse_mode="Markdown",
+            reply_markup=main_menu_keyboard(),
+        )
+        return
+
+    if m.group("menu"):
         await start(update, context)
         return
 
-    if section_input == "ℹ️ INFO":
+    if m.group("info"):
         await info(update, context)
         return
 
-    if re.fullmatch(r"[1-5]\*", section_input):
+    if m.group("rating"):
         log_rating(user, section_input)
         await update.message.reply_text(
             f"🙏 Thank you for rating MR ROUTINE {section_input}!",
@@ -504,8 +1040,8 @@ async def handle_section(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
         return
 
-    if section_input.startswith(FEEDBACK_PREFIX):
-        feedback = section_input[len(FEEDBACK_PREFIX):].strip()
+    if m.group("feedback") is not None:
+        feedback = m.group("feedback").strip()
         if not feedback:
             await update.message.reply_text(
                 "✍️ Please write your feedback after `FB:`.\n"
@@ -520,38 +1056,42 @@ async def handle_section(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
         return
 
-    if not re.fullmatch(r"\d{2}_[A-Z]", section_input):
-        await update.message.reply_text(
-            "⚠️ Please send a valid section code like `66_A` or `69_K`.\n\n"
-            "For feedback, start your message with `FB:`.\n"
-            "For rating, reply with `1*`, `2*`, `3*`, `4*` or `5*`.",
+    cached_reply = _cached_user_reply(user.id, section_input)
+    if cached_reply is not None:
+        await update.message.reply_text(cached_reply, parse_mode="Markdown")
+        return
+
+    status_msg = await update.message.reply_text(WAIT_TEXT, parse_mode="Markdown")
+
+    try:
+        has_files = await maybe_sync()
+    except Exception as e:
+        await status_msg.edit_text(
+            "⚠️ Failed to sync PDFs from Google Drive.\n"
+            f"Error: `{e}`\n"
+            "Make sure Google Drive client secrets, credentials, "
+            "and DRIVE_FOLDER_ID are configured correctly.",
             parse_mode="Markdown",
-            reply_markup=main_menu_keyboard(),
         )
         return
 
-    await update.message.reply_text(
-        "🔍 Syncing PDFs & searching, please wait...\n\n"
-        "⚠️ *Disclaimer:* This bot may make mistakes while reading PDFs. "
-        "Always double-check with the official routine.",
-        parse_mode="Markdown",
-    )
+    if not has_files:
+        await status_msg.edit_text(
+            "🛠️ Maintenance ongoing or routine coming soon.\n"
+            "Currently no routine PDF files are available in the system.",
+        )
+        return
 
     result_text = await asyncio.to_thread(format_section_infos, section_input)
 
-    await update.message.reply_text(result_text, parse_mode="Markdown")
-
-    thank_text = (
-        "🙏 *Thank you for using MR ROUTINE!* 🫶\n\n"
-        "⭐ *Rating:*\n"
-        "Tap a button or reply with `1*`, `2*`, `3*`, `4*` or `5*` to rate this bot.\n\n"
-        "💬 *Feedback:*\n"
-        "Send a message starting with `FB:` followed by your feedback.\n"
-        "Example:\n"
-        "`FB: Please also add day-wise filter or some problem found.`"
-    )
+    _remember_user_reply(user.id, section_input, result_text)
+    # Edit the status message into the result (one send saved vs the
+    # old three), but keep the thank-you as its own reply: edit_text
+    # cannot carry a ReplyKeyboardMarkup, and the rating keyboard has
+    # to reach the user.
+    await status_msg.edit_text(result_text, parse_mode="Markdown")
     await update.message.reply_text(
-        thank_text,
+        THANK_TEXT,
         parse_mode="Markdown",
         reply_markup=rating_keyboard(),
     )
@@ -559,6 +1099,26 @@ async def handle_section(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 # ===================== TELEGRAM BOT ENTRYPOINT ===================== #
 
+async def _post_init(application) -> None:
+    global _log_queue
+    ensure_log_folder()
+    _restore_sync_stamp()
+    _log_queue = asyncio.Queue()
+    application.create_task(_log_writer())
+
+
+async def _post_shutdown(application) -> None:
+    # Final flush: write whatever the background writer has not drained
+    # yet, before the atexit handlers close the log files.
+    if _log_queue is None:
+        return
+    items = []
+    while not _log_queue.empty():
+        items.append(_log_queue.get_nowait())
+    if items:
+        _write_log_lines(items)
+
+
 def main():
     load_dotenv()
 
@@ -566,10 +1126,18 @@ def main():
     if not token:
         raise RuntimeError("BOT_TOKEN not found in environment variables")
 
-    application = ApplicationBuilder().token(token).build()
+    application = (
+        ApplicationBuilder()
+        .token(token)
+        .concurrent_updates(True)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("info", info))
+    application.add_handler(CommandHandler("sync", sync_command))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_section))
 
     webhook_url = os.getenv("WEBHOOK_URL")